@@ -1,11 +1,26 @@
-from flask import Flask, render_template, request, jsonify
+from quart import Quart, Response, render_template, request, jsonify
 import boto3
 import os
 import time  # Added this import
+import functools
+import hashlib
+import tempfile
+import asyncio
 import logging
+import queue
+import ulid
+import threading
+from contextlib import AsyncExitStack
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+# aioboto3 is optional - without it writes run on the blocking boto3 resource
+try:
+    import aioboto3
+except ImportError:
+    aioboto3 = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,29 +28,45 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(__name__)
+app = Quart(__name__)
 
 # AWS Configuration from environment variables
 AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
 AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
 DYNAMODB_TABLE = os.environ.get('DYNAMODB_TABLE', 'UserData')
+USE_DAX = bool(os.environ.get('USE_DAX'))
+DAX_ENDPOINT = os.environ.get('DAX_ENDPOINT')
 
 # Check if required environment variables are set
 if not AWS_ACCESS_KEY_ID or not AWS_SECRET_ACCESS_KEY:
     logger.error("AWS credentials not found in environment variables")
     raise EnvironmentError("AWS credentials not found in environment variables")
 
+if USE_DAX and not DAX_ENDPOINT:
+    logger.error("USE_DAX is set but DAX_ENDPOINT is missing")
+    raise EnvironmentError("USE_DAX is set but DAX_ENDPOINT is missing")
+
 logger.info(f"Using AWS region: {AWS_REGION}")
 logger.info(f"Using DynamoDB table: {DYNAMODB_TABLE}")
 
+# Reuse keep-alive connections across requests instead of a new TLS handshake each time
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=64,
+    connect_timeout=2,
+    read_timeout=5,
+    retries={'max_attempts': 10, 'mode': 'adaptive'}
+)
+
 # Initialize DynamoDB client
 try:
     dynamodb = boto3.resource(
         'dynamodb',
         aws_access_key_id=AWS_ACCESS_KEY_ID,
         aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
+        region_name=AWS_REGION,
+        config=BOTO_CONFIG
     )
     logger.info("DynamoDB client initialized successfully")
 except Exception as e:
@@ -67,39 +98,238 @@ def create_dynamodb_table():
             logger.error(f"Error creating table: {e}")
             raise
 
+# Item reads/writes go through DAX when enabled; table management stays on DynamoDB
+def create_data_resource():
+    if not USE_DAX:
+        return dynamodb
+    from amazondax import AmazonDaxClient
+    session = boto3.Session(
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name=AWS_REGION
+    )
+    logger.info(f"Using DAX endpoint: {DAX_ENDPOINT}")
+    return AmazonDaxClient.resource(session=session, endpoint_url=DAX_ENDPOINT)
+
+# Marker file recording that the table was already created/verified, so
+# restarts skip the CreateTable round trip and wait_until_exists
+TABLE_READY_MARKER = os.path.join(
+    tempfile.gettempdir(),
+    f".ddb_ready_{hashlib.sha1(f'{DYNAMODB_TABLE}:{AWS_REGION}'.encode()).hexdigest()[:16]}"
+)
+
+def is_missing_table(error):
+    return isinstance(error, ClientError) and error.response['Error']['Code'] == 'ResourceNotFoundException'
+
+def clear_table_marker():
+    # The table was deleted after the marker was written; the next start
+    # (or recreate_table) creates it again
+    try:
+        os.remove(TABLE_READY_MARKER)
+    except FileNotFoundError:
+        pass
+
+def recreate_table():
+    clear_table_marker()
+    create_dynamodb_table()
+    open(TABLE_READY_MARKER, 'w').close()
+
 # Initialize table on startup
 try:
-    create_dynamodb_table()
-    table = dynamodb.Table(DYNAMODB_TABLE)
+    if os.path.exists(TABLE_READY_MARKER):
+        logger.info(f"Table {DYNAMODB_TABLE} already verified, skipping creation")
+    else:
+        create_dynamodb_table()
+        open(TABLE_READY_MARKER, 'w').close()
+    table = create_data_resource().Table(DYNAMODB_TABLE)
     logger.info(f"Successfully connected to table {DYNAMODB_TABLE}")
 except Exception as e:
     logger.error(f"Error setting up DynamoDB table: {e}")
     raise
 
+# Long-lived aioboto3 table, opened once when the server starts.
+# The resource is kept open on an exit stack rather than returned from an
+# `async with` block, which would close it before the first request.
+async_table = None
+async_exit_stack = AsyncExitStack()
+
+@app.before_serving
+async def open_async_table():
+    global async_table
+    if aioboto3 is None:
+        logger.info("aioboto3 not installed, falling back to boto3 for writes")
+        return
+    if USE_DAX:
+        # Writing around DAX would leave its item cache stale
+        logger.info("DAX enabled, skipping aioboto3 resource")
+        return
+    session = aioboto3.Session()
+    async_dynamodb = await async_exit_stack.enter_async_context(
+        session.resource(
+            'dynamodb',
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+            region_name=AWS_REGION
+        )
+    )
+    async_table = await async_dynamodb.Table(DYNAMODB_TABLE)
+    logger.info("aioboto3 DynamoDB resource opened")
+
+@app.after_serving
+async def close_async_table():
+    await async_exit_stack.aclose()
+
+async def put_item(item):
+    """Write an item without blocking the event loop"""
+    if async_table is not None:
+        await async_table.put_item(Item=item)
+    else:
+        await asyncio.to_thread(table.put_item, Item=item)
+
+# Submissions are acknowledged once queued and flushed by a background
+# thread in batches of up to 25 items (the BatchWriteItem limit). Queue
+# entries are (item, attempts) pairs.
+BATCH_SIZE = 25
+BATCH_WINDOW_SECONDS = 0.05
+# Items still failing after this many writes are logged and dropped
+MAX_WRITE_ATTEMPTS = 5
+# Errors worth retrying later; anything else (e.g. ValidationException for
+# an item over 400 KB) fails the same way every time
+RETRYABLE_ERROR_CODES = frozenset({
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable'
+})
+write_queue = queue.Queue()
+
+def is_retryable(error):
+    if isinstance(error, ClientError):
+        return error.response['Error']['Code'] in RETRYABLE_ERROR_CODES
+    return True
+
+def requeue(entries, error):
+    for item, attempts in entries:
+        if attempts + 1 >= MAX_WRITE_ATTEMPTS:
+            logger.error(f"Dropping item {item['user_id']} after {attempts + 1} attempts: {error}")
+        else:
+            write_queue.put((item, attempts + 1))
+
+def batch_write_worker():
+    """Drain the write queue into DynamoDB batch writes"""
+    while True:
+        entries = [write_queue.get()]
+        deadline = time.monotonic() + BATCH_WINDOW_SECONDS
+        while len(entries) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entries.append(write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            # batch_writer resends UnprocessedItems itself
+            with table.batch_writer(overwrite_by_pkeys=['user_id']) as batch:
+                for item, _ in entries:
+                    batch.put_item(Item=item)
+            logger.info(f"Batch wrote {len(entries)} items")
+        except Exception as e:
+            if is_missing_table(e):
+                # Every item would fail the same way, so recreate the table
+                # and retry the batch instead of dropping items one by one
+                logger.error(f"Table {DYNAMODB_TABLE} not found, recreating it and re-queueing {len(entries)} items")
+                try:
+                    recreate_table()
+                except Exception as create_error:
+                    logger.error(f"Error recreating table: {create_error}")
+                    time.sleep(1)
+                requeue(entries, e)
+            elif is_retryable(e):
+                logger.error(f"Batch write failed, re-queueing {len(entries)} items: {e}")
+                requeue(entries, e)
+                time.sleep(1)
+            else:
+                # One bad item rejects the whole batch, so write them one at
+                # a time and drop only the items that are rejected
+                logger.error(f"Batch write rejected, writing {len(entries)} items individually: {e}")
+                failed = []
+                for item, attempts in entries:
+                    try:
+                        table.put_item(Item=item)
+                    except Exception as item_error:
+                        if is_retryable(item_error):
+                            failed.append((item, attempts))
+                        else:
+                            logger.error(f"Dropping item {item['user_id']}: {item_error}")
+                if failed:
+                    requeue(failed, e)
+                    time.sleep(1)
+        finally:
+            for _ in entries:
+                write_queue.task_done()
+
+@app.before_serving
+async def start_batch_writer():
+    threading.Thread(target=batch_write_worker, name='dynamodb-batch-writer', daemon=True).start()
+
+@app.after_serving
+async def flush_batch_writer():
+    # Let queued submissions reach DynamoDB before shutting down
+    await asyncio.to_thread(write_queue.join)
+
+# list_tables results are reused for this many seconds
+LIST_TABLES_TTL_SECONDS = 60
+
+@functools.lru_cache(maxsize=1)
+def _list_tables(ttl_bucket):
+    return dynamodb.meta.client.list_tables()['TableNames']
+
+def list_tables_cached():
+    """List table names, hitting DynamoDB at most once per TTL window"""
+    return _list_tables(int(time.monotonic() // LIST_TABLES_TTL_SECONDS))
+
+# index.html has no dynamic content, so it is rendered once at startup
+index_html = None
+index_etag = None
+
+@app.before_serving
+async def render_index():
+    global index_html, index_etag
+    # url_for in the template needs a request to build URLs against
+    async with app.test_request_context('/'):
+        index_html = (await render_template('index.html')).encode()
+    index_etag = hashlib.sha1(index_html).hexdigest()
+
 @app.route('/')
-def index():
+async def index():
     logger.info("Serving index page")
-    return render_template('index.html')
+    headers = {'ETag': f'"{index_etag}"', 'Cache-Control': 'public, max-age=300'}
+    if request.if_none_match.contains(index_etag):
+        return Response(b'', status=304, headers=headers)
+    return Response(index_html, content_type='text/html; charset=utf-8', headers=headers)
 
 @app.route('/test-db')
-def test_db():
+async def test_db():
     try:
         # List tables to test connection
-        tables = dynamodb.meta.client.list_tables()
-        return f"Connection successful. Tables: {tables['TableNames']}"
+        tables = await asyncio.to_thread(list_tables_cached)
+        return f"Connection successful. Tables: {tables}"
     except Exception as e:
         logger.error(f"Database test failed: {e}")
         return f"Error: {str(e)}"
 
 @app.route('/submit', methods=['POST'])
-def submit():
+async def submit():
     try:
         logger.info("Received form submission")
         
         # Get form data
-        name = request.form.get('name')
-        email = request.form.get('email')
-        message = request.form.get('message')
+        form = await request.form
+        name = form.get('name')
+        email = form.get('email')
+        message = form.get('message')
         
         logger.info(f"Form data: name={name}, email={email}, message={message}")
         
@@ -107,22 +337,29 @@ def submit():
             logger.warning("Missing form fields")
             return jsonify({'status': 'error', 'message': 'All fields are required'})
         
-        # Generate unique ID (now using the imported time module)
-        user_id = f"user_{int(time.time())}"
+        # ULIDs stay unique within the same second and spread writes across partitions
+        user_id = f"user_{ulid.new().str}"
         
-        # Store in DynamoDB
-        table.put_item(
-            Item={
-                'user_id': user_id,
-                'name': name,
-                'email': email,
-                'message': message
-            }
-        )
-        logger.info(f"Successfully stored item with user_id: {user_id}")
-        return jsonify({'status': 'success', 'message': 'Data saved successfully!'})
+        item = {
+            'user_id': user_id,
+            'name': name,
+            'email': email,
+            'message': message
+        }
+        
+        # ?sync=1 writes straight to DynamoDB before responding
+        if request.args.get('sync') == '1':
+            await put_item(item)
+            logger.info(f"Successfully stored item with user_id: {user_id}")
+            return jsonify({'status': 'success', 'message': 'Data saved successfully!'})
+        
+        write_queue.put((item, 0))
+        logger.info(f"Queued item with user_id: {user_id}")
+        return jsonify({'status': 'success', 'message': 'Data received successfully!'})
     except Exception as e:
         logger.error(f"Error in submit route: {e}")
+        if is_missing_table(e):
+            clear_table_marker()
         return jsonify({'status': 'error', 'message': str(e)})
 
 if __name__ == '__main__':
@@ -0,0 +1,4 @@
+from .serialization import dumps, loads
+from .session import client, get_client_config, get_session, resource
+
+__all__ = ['client', 'dumps', 'get_client_config', 'get_session', 'loads', 'resource']
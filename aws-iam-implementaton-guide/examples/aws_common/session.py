@@ -0,0 +1,54 @@
+"""
+Shared boto3 session and client configuration
+Every boto3.Session loads its own copy of the endpoint and service model
+data, so the example modules create all their clients from this one.
+"""
+
+import functools
+import threading
+
+
+@functools.lru_cache(maxsize=None)
+def get_session():
+    """Return the process-wide boto3 Session"""
+    # boto3 (and botocore's loaders) are imported on first use, not at import
+    import boto3
+    return boto3.Session()
+
+
+# Sized for the thread-pooled helpers; adaptive retries back off on throttling
+# and keep-alive avoids a new TLS handshake per request
+MAX_POOL_CONNECTIONS = 50
+
+
+@functools.lru_cache(maxsize=None)
+def get_client_config():
+    """Return the botocore Config shared by every client and resource"""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        retries={'mode': 'adaptive', 'max_attempts': 10},
+        tcp_keepalive=True
+    )
+
+
+# boto3 Sessions are not thread-safe, so clients and resources are created
+# one at a time even when several threads ask for their first one together
+_create_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def client(name, region=None):
+    """
+    Return the process-wide client for a service, built on first use from the
+    shared session and config; call client.cache_clear() to force new ones
+    """
+    with _create_lock:
+        return get_session().client(name, region_name=region, config=get_client_config())
+
+
+@functools.lru_cache(maxsize=None)
+def resource(name, region=None):
+    """Return the process-wide resource for a service (see client)"""
+    with _create_lock:
+        return get_session().resource(name, region_name=region, config=get_client_config())
@@ -4,240 +4,62 @@ AWS IAM Policy Examples
 Demonstrates various IAM policy patterns and best practices
 """
 
-import json
-
-
-# Example 1: S3 Bucket Read-Only Access
-S3_READ_ONLY_POLICY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": [
-                "s3:GetObject",
-                "s3:ListBucket"
-            ],
-            "Resource": [
-                "arn:aws:s3:::my-bucket",
-                "arn:aws:s3:::my-bucket/*"
-            ]
-        }
-    ]
+import functools
+import os
+from aws_common import dumps, loads
+
+# The policy documents live in policies.json next to this file and are only
+# parsed the first time a constant such as S3_READ_ONLY_POLICY is used
+_POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'policies.json')
+
+# Display name -> policy constant
+POLICY_NAMES = {
+    "S3 Read-Only Access": "S3_READ_ONLY_POLICY",                  # Example 1: S3 Bucket Read-Only Access
+    "S3 IP Restricted": "S3_IP_RESTRICTED_POLICY",                 # Example 2: S3 Bucket with Conditions (IP Restriction)
+    "MFA Required": "MFA_REQUIRED_POLICY",                         # Example 3: Time-Based Access (MFA Required)
+    "Tag-Based Access": "TAG_BASED_POLICY",                        # Example 4: Resource Tag-Based Access
+    "Least Privilege": "LEAST_PRIVILEGE_POLICY",                   # Example 5: Least Privilege - Specific Resource Access
+    "Lambda Cross-Service": "LAMBDA_CROSS_SERVICE_POLICY",         # Example 6: Cross-Service Access (Lambda to S3 and DynamoDB)
+    "Explicit Deny": "EXPLICIT_DENY_POLICY",                       # Example 7: Deny Policy (Explicit Deny)
+    "Permissions Boundary": "PERMISSIONS_BOUNDARY",                # Example 8: Permissions Boundary (Limits Maximum Permissions)
+    "SCP Pattern": "SCP_PATTERN",                                  # Example 9: Service Control Policy (SCP) Pattern
+    "Self-Management": "SELF_MANAGEMENT_POLICY"                    # Example 10: Self-Management Policy (Users can manage their own credentials)
 }
 
-# Example 2: S3 Bucket with Conditions (IP Restriction)
-S3_IP_RESTRICTED_POLICY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": [
-                "s3:GetObject",
-                "s3:PutObject"
-            ],
-            "Resource": "arn:aws:s3:::my-bucket/*",
-            "Condition": {
-                "IpAddress": {
-                    "aws:SourceIp": "203.0.113.0/24"
-                }
-            }
-        }
-    ]
-}
 
-# Example 3: Time-Based Access (MFA Required)
-MFA_REQUIRED_POLICY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": [
-                "ec2:StartInstances",
-                "ec2:StopInstances"
-            ],
-            "Resource": "*",
-            "Condition": {
-                "BoolIfExists": {
-                    "aws:MultiFactorAuthPresent": "true"
-                }
-            }
-        }
-    ]
-}
+@functools.lru_cache(maxsize=None)
+def _policies():
+    """Load every policy from policies.json (once)"""
+    with open(_POLICY_FILE, 'rb') as f:
+        return loads(f.read())
 
-# Example 4: Resource Tag-Based Access
-TAG_BASED_POLICY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": [
-                "ec2:StartInstances",
-                "ec2:StopInstances",
-                "ec2:TerminateInstances"
-            ],
-            "Resource": "*",
-            "Condition": {
-                "StringEquals": {
-                    "ec2:ResourceTag/Owner": "${aws:username}"
-                }
-            }
-        }
-    ]
-}
 
-# Example 5: Least Privilege - Specific Resource Access
-LEAST_PRIVILEGE_POLICY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": [
-                "dynamodb:GetItem",
-                "dynamodb:Query"
-            ],
-            "Resource": "arn:aws:dynamodb:us-east-1:123456789012:table/Users"
-        },
-        {
-            "Effect": "Allow",
-            "Action": [
-                "dynamodb:PutItem"
-            ],
-            "Resource": "arn:aws:dynamodb:us-east-1:123456789012:table/Users",
-            "Condition": {
-                "StringEquals": {
-                    "dynamodb:LeadingKeys": "${aws:username}"
-                }
-            }
-        }
-    ]
-}
+def __getattr__(name):
+    """Resolve policy constants such as S3_READ_ONLY_POLICY on first access"""
+    if name in POLICY_NAMES.values():
+        return _policies()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Example 6: Cross-Service Access (Lambda to S3 and DynamoDB)
-LAMBDA_CROSS_SERVICE_POLICY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": [
-                "s3:GetObject",
-                "s3:PutObject"
-            ],
-            "Resource": "arn:aws:s3:::my-lambda-bucket/*"
-        },
-        {
-            "Effect": "Allow",
-            "Action": [
-                "dynamodb:PutItem",
-                "dynamodb:GetItem",
-                "dynamodb:UpdateItem"
-            ],
-            "Resource": "arn:aws:dynamodb:*:*:table/MyTable"
-        },
-        {
-            "Effect": "Allow",
-            "Action": [
-                "logs:CreateLogGroup",
-                "logs:CreateLogStream",
-                "logs:PutLogEvents"
-            ],
-            "Resource": "arn:aws:logs:*:*:*"
-        }
-    ]
-}
 
-# Example 7: Deny Policy (Explicit Deny)
-EXPLICIT_DENY_POLICY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": "s3:*",
-            "Resource": "*"
-        },
-        {
-            "Effect": "Deny",
-            "Action": "s3:DeleteBucket",
-            "Resource": "*"
-        }
-    ]
-}
+def __dir__():
+    return sorted([*globals(), *POLICY_NAMES.values()])
 
-# Example 8: Permissions Boundary (Limits Maximum Permissions)
-PERMISSIONS_BOUNDARY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": [
-                "s3:*",
-                "dynamodb:*"
-            ],
-            "Resource": "*"
-        },
-        {
-            "Effect": "Deny",
-            "Action": [
-                "iam:*",
-                "ec2:DeleteVpc",
-                "rds:DeleteDBInstance"
-            ],
-            "Resource": "*"
-        }
-    ]
-}
 
-# Example 9: Service Control Policy (SCP) Pattern
-SCP_PATTERN = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Deny",
-            "Action": [
-                "ec2:RunInstances"
-            ],
-            "Resource": "*",
-            "Condition": {
-                "StringNotEquals": {
-                    "ec2:InstanceType": [
-                        "t2.micro",
-                        "t2.small"
-                    ]
-                }
-            }
-        }
-    ]
-}
+# Star imports resolve the lazy constants through __getattr__
+__all__ = [*POLICY_NAMES.values(), 'POLICY_NAMES', 'print_policy']
 
-# Example 10: Self-Management Policy (Users can manage their own credentials)
-SELF_MANAGEMENT_POLICY = {
-    "Version": "2012-10-17",
-    "Statement": [
-        {
-            "Effect": "Allow",
-            "Action": [
-                "iam:ChangePassword",
-                "iam:GetUser",
-                "iam:CreateAccessKey",
-                "iam:DeleteAccessKey",
-                "iam:ListAccessKeys",
-                "iam:UpdateAccessKey",
-                "iam:ListAttachedUserPolicies",
-                "iam:ListUserPolicies",
-                "iam:GetUserPolicy"
-            ],
-            "Resource": "arn:aws:iam::*:user/${aws:username}"
-        }
-    ]
-}
 
+@functools.lru_cache(maxsize=None)
+def _rendered(name):
+    return dumps(_policies()[POLICY_NAMES[name]], indent=True)
 
-def print_policy(name, policy):
-    """Pretty print a policy"""
+
+def print_policy(name, policy=None):
+    """Pretty print a policy (looked up by name unless one is passed)"""
     print(f"\n{'='*60}")
     print(f"Policy: {name}")
     print(f"{'='*60}")
-    print(json.dumps(policy, indent=2))
+    print(_rendered(name) if policy is None else dumps(policy, indent=True))
 
 
 if __name__ == "__main__":
@@ -245,24 +67,10 @@ if __name__ == "__main__":
     print("AWS IAM Policy Examples")
     print("=" * 60)
     
-    policies = {
-        "S3 Read-Only Access": S3_READ_ONLY_POLICY,
-        "S3 IP Restricted": S3_IP_RESTRICTED_POLICY,
-        "MFA Required": MFA_REQUIRED_POLICY,
-        "Tag-Based Access": TAG_BASED_POLICY,
-        "Least Privilege": LEAST_PRIVILEGE_POLICY,
-        "Lambda Cross-Service": LAMBDA_CROSS_SERVICE_POLICY,
-        "Explicit Deny": EXPLICIT_DENY_POLICY,
-        "Permissions Boundary": PERMISSIONS_BOUNDARY,
-        "SCP Pattern": SCP_PATTERN,
-        "Self-Management": SELF_MANAGEMENT_POLICY
-    }
-    
-    for name, policy in policies.items():
-        print_policy(name, policy)
+    for name in POLICY_NAMES:
+        print_policy(name)
     
     print("\n" + "=" * 60)
     print("These are example policies for reference.")
     print("Modify resource ARNs and conditions as needed.")
     print("=" * 60)
-
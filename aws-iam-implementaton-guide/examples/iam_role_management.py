@@ -4,20 +4,19 @@ AWS IAM Role Management Examples
 Demonstrates IAM role creation and management using boto3
 """
 
-import boto3
-import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from botocore.exceptions import ClientError
-
-# Initialize IAM client
-iam_client = boto3.client('iam')
+from aws_common import client, dumps
 
 
 def create_iam_role(role_name, trust_policy, description=""):
-    """Create an IAM role with a trust policy"""
+    """Create an IAM role with a trust policy (dict or pre-serialized JSON string)"""
+    policy_document = trust_policy if isinstance(trust_policy, str) else dumps(trust_policy)
     try:
-        response = iam_client.create_role(
+        response = client('iam').create_role(
             RoleName=role_name,
-            AssumeRolePolicyDocument=json.dumps(trust_policy),
+            AssumeRolePolicyDocument=policy_document,
             Description=description
         )
         print(f"✅ Created IAM role: {role_name}")
@@ -34,7 +33,7 @@ def create_iam_role(role_name, trust_policy, description=""):
 def attach_policy_to_role(role_name, policy_arn):
     """Attach a managed policy to a role"""
     try:
-        iam_client.attach_role_policy(
+        client('iam').attach_role_policy(
             RoleName=role_name,
             PolicyArn=policy_arn
         )
@@ -46,7 +45,7 @@ def attach_policy_to_role(role_name, policy_arn):
 def create_instance_profile(profile_name):
     """Create an instance profile for EC2"""
     try:
-        response = iam_client.create_instance_profile(
+        response = client('iam').create_instance_profile(
             InstanceProfileName=profile_name
         )
         print(f"✅ Created instance profile: {profile_name}")
@@ -62,7 +61,7 @@ def create_instance_profile(profile_name):
 def add_role_to_instance_profile(role_name, profile_name):
     """Add a role to an instance profile"""
     try:
-        iam_client.add_role_to_instance_profile(
+        client('iam').add_role_to_instance_profile(
             InstanceProfileName=profile_name,
             RoleName=role_name
         )
@@ -71,15 +70,25 @@ def add_role_to_instance_profile(role_name, profile_name):
         print(f"❌ Error adding role to instance profile: {e}")
 
 
+# Temporary credentials by (role_arn, session_name), reused until shortly before they expire
+_sts_cache = {}
+STS_REFRESH_MARGIN = timedelta(minutes=2)
+
+
 def assume_role(role_arn, session_name):
-    """Assume an IAM role and get temporary credentials"""
-    sts_client = boto3.client('sts')
+    """Assume an IAM role and get temporary credentials (cached until near expiry)"""
+    key = (role_arn, session_name)
+    cached = _sts_cache.get(key)
+    if cached is not None and cached['Expiration'] - datetime.now(timezone.utc) > STS_REFRESH_MARGIN:
+        print(f"✅ Using cached credentials for role: {role_arn}")
+        return cached
     try:
-        response = sts_client.assume_role(
+        response = client('sts').assume_role(
             RoleArn=role_arn,
             RoleSessionName=session_name
         )
         credentials = response['Credentials']
+        _sts_cache[key] = credentials
         print(f"✅ Assumed role: {role_arn}")
         print(f"   Access Key ID: {credentials['AccessKeyId']}")
         print(f"   Expires: {credentials['Expiration']}")
@@ -89,7 +98,7 @@ def assume_role(role_arn, session_name):
         return None
 
 
-# Example trust policies
+# Example trust policies (the _JSON constants are pre-serialized for create_iam_role)
 EC2_TRUST_POLICY = {
     "Version": "2012-10-17",
     "Statement": [
@@ -102,6 +111,7 @@ EC2_TRUST_POLICY = {
         }
     ]
 }
+EC2_TRUST_POLICY_JSON = dumps(EC2_TRUST_POLICY)
 
 LAMBDA_TRUST_POLICY = {
     "Version": "2012-10-17",
@@ -115,6 +125,7 @@ LAMBDA_TRUST_POLICY = {
         }
     ]
 }
+LAMBDA_TRUST_POLICY_JSON = dumps(LAMBDA_TRUST_POLICY)
 
 CROSS_ACCOUNT_TRUST_POLICY = {
     "Version": "2012-10-17",
@@ -133,19 +144,15 @@ CROSS_ACCOUNT_TRUST_POLICY = {
         }
     ]
 }
+CROSS_ACCOUNT_TRUST_POLICY_JSON = dumps(CROSS_ACCOUNT_TRUST_POLICY)
 
 
-# Example usage
-if __name__ == "__main__":
-    print("=" * 60)
-    print("AWS IAM Role Management Examples")
-    print("=" * 60)
-    
-    # Example 1: Create EC2 role
+def setup_ec2_role():
+    """Example 1: EC2 role with S3 read access and an instance profile"""
     ec2_role_name = "EC2-S3-Access-Role"
     create_iam_role(
         ec2_role_name,
-        EC2_TRUST_POLICY,
+        EC2_TRUST_POLICY_JSON,
         "Allows EC2 instances to access S3"
     )
     attach_policy_to_role(ec2_role_name, "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess")
@@ -154,22 +161,36 @@ if __name__ == "__main__":
     profile_name = "EC2-S3-Access-Profile"
     create_instance_profile(profile_name)
     add_role_to_instance_profile(ec2_role_name, profile_name)
-    
-    # Example 2: Create Lambda role
+
+
+def setup_lambda_role():
+    """Example 2: Lambda role with DynamoDB access"""
     lambda_role_name = "Lambda-DynamoDB-Role"
     create_iam_role(
         lambda_role_name,
-        LAMBDA_TRUST_POLICY,
+        LAMBDA_TRUST_POLICY_JSON,
         "Allows Lambda to access DynamoDB"
     )
     attach_policy_to_role(lambda_role_name, "arn:aws:iam::aws:policy/AmazonDynamoDBFullAccess")
+
+
+# Example usage
+if __name__ == "__main__":
+    print("=" * 60)
+    print("AWS IAM Role Management Examples")
+    print("=" * 60)
+    
+    # Examples 1 and 2 share no resources, so the two call chains run in
+    # parallel; calls within each chain stay in order
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for future in [executor.submit(setup_ec2_role), executor.submit(setup_lambda_role)]:
+            future.result()
     
     # Example 3: Cross-account role (commented - requires account ID)
     # cross_account_role = "CrossAccountAccessRole"
-    # create_iam_role(cross_account_role, CROSS_ACCOUNT_TRUST_POLICY)
+    # create_iam_role(cross_account_role, CROSS_ACCOUNT_TRUST_POLICY_JSON)
     
     print("\n" + "=" * 60)
     print("Note: This is a demonstration script.")
     print("Review and modify before running in production!")
     print("=" * 60)
-
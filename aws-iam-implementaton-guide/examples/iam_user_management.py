@@ -4,12 +4,13 @@ AWS IAM User Management Examples
 Demonstrates common IAM user operations using boto3
 """
 
-import boto3
-import json
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
+from aws_common import client, dumps
 
-# Initialize IAM client
-iam_client = boto3.client('iam')
+# Initialize IAM client once per process with the shared config (keep-alive,
+# adaptive retries, and a pool large enough for the concurrent demo below)
+iam_client = client('iam')
 
 
 def create_iam_user(username):
@@ -55,11 +56,13 @@ def attach_policy_to_user(username, policy_arn):
 
 
 def create_custom_policy(policy_name, policy_document):
-    """Create a custom IAM policy"""
+    """Create a custom IAM policy from a dict or an already-encoded JSON string"""
+    if not isinstance(policy_document, str):
+        policy_document = dumps(policy_document)
     try:
         response = iam_client.create_policy(
             PolicyName=policy_name,
-            PolicyDocument=json.dumps(policy_document)
+            PolicyDocument=policy_document
         )
         print(f"✅ Created custom policy: {policy_name}")
         print(f"   Policy ARN: {response['Policy']['Arn']}")
@@ -98,11 +101,51 @@ def add_user_to_group(username, group_name):
         print(f"❌ Error adding user to group: {e}")
 
 
+def attach_policy_to_group(group_name, policy_arn):
+    """Attach a managed policy to a group"""
+    try:
+        iam_client.attach_group_policy(
+            GroupName=group_name,
+            PolicyArn=policy_arn
+        )
+        print(f"✅ Attached policy {policy_arn} to group {group_name}")
+        return True
+    except ClientError as e:
+        print(f"❌ Error attaching policy to group: {e}")
+        return False
+
+
+# Policies already attached per group by ensure_group_with_policies
+_group_policies = {}
+
+
+def ensure_group_with_policies(group_name, policy_arns):
+    """Create a group and attach each policy once, then reuse it for every user.
+
+    Adding N users to the group costs N + M calls instead of N * M
+    attach_user_policy calls for M policies.
+    """
+    if group_name not in _group_policies:
+        create_iam_group(group_name)
+        _group_policies[group_name] = set()
+    attached = _group_policies[group_name]
+    for policy_arn in policy_arns:
+        if policy_arn not in attached and attach_policy_to_group(group_name, policy_arn):
+            attached.add(policy_arn)
+    return group_name
+
+
+def iter_users():
+    """Yield all IAM users, fetching one page at a time"""
+    paginator = iam_client.get_paginator('list_users')
+    for page in paginator.paginate(PaginationConfig={'PageSize': 1000}):
+        yield from page['Users']
+
+
 def list_users():
     """List all IAM users"""
     try:
-        response = iam_client.list_users()
-        users = response['Users']
+        users = list(iter_users())
         print(f"\n📋 Found {len(users)} IAM users:")
         for user in users:
             print(f"   - {user['UserName']} (Created: {user['CreateDate']})")
@@ -116,19 +159,25 @@ def get_user_policies(username):
     """Get all policies attached to a user"""
     try:
         # Get attached managed policies
-        attached_policies = iam_client.list_attached_user_policies(UserName=username)
+        attached_pages = iam_client.get_paginator('list_attached_user_policies').paginate(
+            UserName=username, PaginationConfig={'PageSize': 1000}
+        )
         
         # Get inline policies
-        inline_policies = iam_client.list_user_policies(UserName=username)
+        inline_pages = iam_client.get_paginator('list_user_policies').paginate(
+            UserName=username, PaginationConfig={'PageSize': 1000}
+        )
         
         print(f"\n📋 Policies for user {username}:")
         print("   Managed Policies:")
-        for policy in attached_policies['AttachedPolicies']:
-            print(f"      - {policy['PolicyName']} ({policy['PolicyArn']})")
+        for page in attached_pages:
+            for policy in page['AttachedPolicies']:
+                print(f"      - {policy['PolicyName']} ({policy['PolicyArn']})")
         
         print("   Inline Policies:")
-        for policy_name in inline_policies['PolicyNames']:
-            print(f"      - {policy_name}")
+        for page in inline_pages:
+            for policy_name in page['PolicyNames']:
+                print(f"      - {policy_name}")
     except ClientError as e:
         print(f"❌ Error getting user policies: {e}")
 
@@ -139,15 +188,8 @@ if __name__ == "__main__":
     print("AWS IAM User Management Examples")
     print("=" * 60)
     
-    # Example: Create a user
     username = "demo-user"
-    create_iam_user(username)
-    
-    # Example: Create access keys (commented out for security)
-    # create_access_key(username)
-    
-    # Example: Attach AWS managed policy
-    attach_policy_to_user(username, "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess")
+    group_name = "developers"
     
     # Example: Create custom policy
     custom_policy = {
@@ -166,17 +208,28 @@ if __name__ == "__main__":
             }
         ]
     }
-    create_custom_policy("MyCustomS3Policy", custom_policy)
     
-    # Example: Create group and add user
-    group_name = "developers"
-    create_iam_group(group_name)
-    add_user_to_group(username, group_name)
+    # Example: Create access keys (commented out for security)
+    # create_access_key(username)
     
-    # List all users
-    list_users()
+    # Independent IAM calls run concurrently; each step only waits on the
+    # calls it actually depends on (boto3 clients are thread-safe)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        user_created = executor.submit(create_iam_user, username)
+        executor.submit(create_custom_policy, "MyCustomS3Policy", custom_policy)
+        # Example: Attach AWS managed policy through a group rather than per user
+        group_created = executor.submit(
+            ensure_group_with_policies, group_name, ["arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"]
+        )
+        
+        # Example: Add user to the pre-configured group
+        user_created.result()
+        group_created.result()
+        executor.submit(add_user_to_group, username, group_name).result()
     
-    # Get user policies
+    # List all users and get user policies; these only report, so they run
+    # one after the other to keep their output readable
+    list_users()
     get_user_policies(username)
     
     print("\n" + "=" * 60)
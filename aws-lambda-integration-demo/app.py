@@ -3,31 +3,81 @@ AWS Lambda Demonstration Application
 This Flask app simulates AWS Lambda behavior for educational purposes.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import atexit
 import json
+import queue
 import time
+import uuid
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 
+# numpy is optional; it speeds up squaring large numeric batches
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# orjson is optional; it encodes handler responses several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 app = Flask(__name__)
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def setup_logging(level=logging.INFO):
+    """
+    Send log records through a queue so request threads never block on
+    stderr; a listener thread does the writing. Listener threads do not
+    survive fork, so each gunicorn worker calls this again.
+    """
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+
+
+setup_logging()
+
+
 class LambdaContext:
     """Simulates AWS Lambda Context object"""
     def __init__(self, function_name, memory_limit_mb=128, timeout=30):
         self.function_name = function_name
         self.memory_limit_mb = memory_limit_mb
         self.timeout = timeout
-        self.start_time = time.time()
-        self.request_id = f"sim-{int(time.time() * 1000)}"
+        self.timeout_ms = timeout * 1000
+        # Monotonic clock: only used for elapsed time, immune to clock changes
+        self.start_time = time.monotonic()
+        self.request_id = f"sim-{uuid.uuid4().hex[:12]}"
     
     def get_remaining_time_in_millis(self):
         """Returns remaining execution time"""
-        elapsed = (time.time() - self.start_time) * 1000
-        remaining = (self.timeout * 1000) - elapsed
-        return max(0, remaining)
+        elapsed = (time.monotonic() - self.start_time) * 1000
+        return max(0, self.timeout_ms - elapsed)
+
+
+def json_response(payload, status=200):
+    """Compact JSON response, encoded with orjson when available"""
+    body = None
+    if orjson is not None:
+        try:
+            body = orjson.dumps(payload)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the json module still handles
+            pass
+    if body is None:
+        body = json.dumps(payload, separators=(',', ':'))
+    return Response(body, status=status, mimetype='application/json')
 
 
 def lambda_handler_wrapper(handler_func):
@@ -36,31 +86,61 @@ def lambda_handler_wrapper(handler_func):
         try:
             # Simulate Lambda event and context
             event = request.get_json() if request.is_json else request.form.to_dict()
+            # Request details are read from Flask once here; handlers use event['_request']
+            event['_request'] = {
+                'method': request.method,
+                'path': request.path,
+                'headers': request.headers
+            }
             context = LambdaContext(function_name=handler_func.__name__)
             
-            logger.info(f"Invoking Lambda function: {handler_func.__name__}")
-            logger.info(f"Request ID: {context.request_id}")
+            logger.info("Invoking Lambda function: %s", handler_func.__name__)
+            logger.info("Request ID: %s", context.request_id)
             
             # Execute handler
             result = handler_func(event, context)
             
-            return jsonify({
+            return json_response({
                 'statusCode': 200,
                 'body': result,
                 'requestId': context.request_id,
-                'executionTime': f"{(time.time() - context.start_time) * 1000:.2f}ms"
+                'executionTime': f"{(time.monotonic() - context.start_time) * 1000:.2f}ms"
             })
         except Exception as e:
-            logger.error(f"Error in Lambda function: {str(e)}")
-            return jsonify({
+            logger.error("Error in Lambda function: %s", e)
+            return json_response({
                 'statusCode': 500,
                 'error': str(e),
                 'requestId': context.request_id if 'context' in locals() else 'unknown'
-            }), 500
+            }, status=500)
     wrapper.__name__ = handler_func.__name__
     return wrapper
 
 
+# Below this size converting to a numpy array costs more than it saves
+NUMPY_MIN_ITEMS = 256
+# Integers below this magnitude square without overflowing int64
+INT64_SAFE_SQUARE = 2 ** 31
+
+
+def square_numbers(data):
+    """Square numeric items, leaving everything else untouched"""
+    if np is not None and len(data) >= NUMPY_MIN_ITEMS:
+        # Only homogeneous lists take the fast path, so results keep their types
+        # (ints stay ints, bools are not squared as numbers by numpy)
+        item_types = set(map(type, data))
+        if item_types == {float}:
+            # Overflow falls through so it raises OverflowError like the comprehension
+            try:
+                with np.errstate(over='raise'):
+                    return np.square(np.asarray(data, dtype=np.float64)).tolist()
+            except FloatingPointError:
+                pass
+        if item_types == {int} and -INT64_SAFE_SQUARE < min(data) and max(data) < INT64_SAFE_SQUARE:
+            return np.square(np.asarray(data, dtype=np.int64)).tolist()
+    return [item ** 2 if isinstance(item, (int, float)) else item for item in data]
+
+
 # Example Lambda Handler 1: Simple Hello World
 @lambda_handler_wrapper
 def hello_world_handler(event, context):
@@ -89,7 +169,7 @@ def data_processor_handler(event, context):
         raise ValueError("Data must be a list")
     
     # Process data: square each number
-    processed = [item ** 2 if isinstance(item, (int, float)) else item for item in data]
+    processed = square_numbers(data)
     
     return {
         'original': data,
@@ -108,15 +188,16 @@ def api_gateway_handler(event, context):
     Demonstrates how Lambda works with API Gateway.
     """
     # Simulate API Gateway event structure
-    http_method = event.get('httpMethod', request.method)
-    path = event.get('path', request.path)
+    http_request = event['_request']
+    http_method = event.get('httpMethod', http_request['method'])
+    path = event.get('path', http_request['path'])
     query_params = event.get('queryStringParameters', {}) or {}
     body = event.get('body', '{}')
     
     # Parse body if it's a string
     if isinstance(body, str):
         try:
-            body = json.loads(body)
+            body = orjson.loads(body) if orjson is not None else json.loads(body)
         except:
             body = {}
     
@@ -126,7 +207,7 @@ def api_gateway_handler(event, context):
         'path': path,
         'queryParameters': query_params,
         'body': body,
-        'headers': dict(request.headers),
+        'headers': dict(http_request['headers']),
         'requestId': context.request_id
     }
 
@@ -242,6 +323,33 @@ def error_route():
     return error_handler_demo()
 
 
+def run_server(host='0.0.0.0', port=5000, workers=4, threads=8):
+    """
+    Serve the app with gunicorn (gthread workers), equivalent to
+    `gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 app:app`.
+    Falls back to the threaded Werkzeug server, without debug mode,
+    where gunicorn is unavailable (e.g. Windows).
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        app.run(host=host, port=port, threaded=True)
+        return
+
+    class GunicornApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', threads)
+            self.cfg.set('post_fork', lambda server, worker: setup_logging())
+
+        def load(self):
+            return app
+
+    GunicornApplication().run()
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("AWS Lambda Demonstration Application")
@@ -255,5 +363,5 @@ if __name__ == '__main__':
     print("  POST /lambda/error - Error handler demo")
     print("\nStarting Flask server on http://localhost:5000")
     print("=" * 60)
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    run_server()
 
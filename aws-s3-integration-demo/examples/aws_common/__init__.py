@@ -0,0 +1,5 @@
+from .serialization import dumps, loads
+from .session import client, get_client_config, get_session, resource
+from .transfer import get_transfer_config
+
+__all__ = ['client', 'dumps', 'get_client_config', 'get_session', 'get_transfer_config', 'loads', 'resource']
@@ -0,0 +1,28 @@
+"""
+Shared JSON encoding and decoding
+orjson is used when it is installed and the json module otherwise; both
+produce the same documents.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj, indent=False):
+    """Serialize obj to a str, compact unless indent is set (2 spaces)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def loads(data):
+    """Parse a JSON document from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
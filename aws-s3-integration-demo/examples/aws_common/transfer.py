@@ -0,0 +1,29 @@
+"""
+Shared S3 managed-transfer tuning
+Files above MULTIPART_THRESHOLD are split into CHUNK_SIZE parts with up to
+CONCURRENCY parts in flight per file. The values are read on every call, so
+changing them (e.g. aws_common.transfer.CHUNK_SIZE = ...) affects later
+transfers.
+"""
+
+from .session import MAX_POOL_CONNECTIONS
+
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+CHUNK_SIZE = 16 * 1024 * 1024
+CONCURRENCY = 16
+
+
+def get_transfer_config(workers=1):
+    """
+    Return a TransferConfig for one of `workers` files transferred at once.
+    Per-file concurrency is reduced so that all the parts in flight fit in
+    the shared client's connection pool.
+    """
+    # boto3 is imported on first use rather than at module import
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=CHUNK_SIZE,
+        max_concurrency=max(1, min(CONCURRENCY, MAX_POOL_CONNECTIONS // workers)),
+        use_threads=True
+    )
@@ -1,13 +1,50 @@
 #!/usr/bin/env python3
-import boto3
 from botocore.exceptions import ClientError
+from aws_common import client, dumps, get_session
 import json
-from datetime import datetime, timedelta
+import base64
+import hashlib
+import hmac
+import inspect
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
-s3_client = boto3.client('s3')
+s3_client = client('s3')
+_REGION = s3_client.meta.region_name
+_WEBSITE_URL_FMT = f"http://{{bucket}}.s3-website-{_REGION}.amazonaws.com"
+
+# Error codes S3 returns when a bucket has no configuration of that kind yet
+_MISSING_CONFIG_CODES = {
+    'NoSuchLifecycleConfiguration',
+    'NoSuchCORSConfiguration',
+    'ServerSideEncryptionConfigurationNotFoundError',
+}
+
+def _current_rules(get_rules):
+    # None means the configuration could not be read (e.g. the caller may
+    # PUT but not GET it); the PUT is then sent without the check
+    try:
+        return get_rules()
+    except ClientError as e:
+        if e.response['Error']['Code'] in _MISSING_CONFIG_CODES:
+            return []
+        return None
+
+def _rules_match(current_rules, desired_rules):
+    # S3 may add defaulted fields to stored rules, so only the fields we set are compared
+    return current_rules is not None and len(current_rules) == len(desired_rules) and all(
+        any(all(current.get(k) == v for k, v in desired.items()) for current in current_rules)
+        for desired in desired_rules
+    )
 
 def enable_versioning(bucket_name):
     try:
+        # Reads are cheaper than writes and not subject to bucket-config rate limits
+        if _current_rules(lambda: s3_client.get_bucket_versioning(Bucket=bucket_name).get('Status')) == 'Enabled':
+            print(f"Versioning already enabled for bucket '{bucket_name}'")
+            return True
         s3_client.put_bucket_versioning(
             Bucket=bucket_name,
             VersioningConfiguration={'Status': 'Enabled'}
@@ -37,6 +74,10 @@ def enable_lifecycle_policy(bucket_name, transition_days=30, expiration_days=365
                 }
             ]
         }
+        current = _current_rules(lambda: s3_client.get_bucket_lifecycle_configuration(Bucket=bucket_name)['Rules'])
+        if _rules_match(current, lifecycle_config['Rules']):
+            print(f"Lifecycle policy already configured for bucket '{bucket_name}'")
+            return True
         s3_client.put_bucket_lifecycle_configuration(
             Bucket=bucket_name,
             LifecycleConfiguration=lifecycle_config
@@ -57,6 +98,12 @@ def enable_encryption(bucket_name, encryption_type='AES256'):
             encryption_config = {
                 'Rules': [{'ApplyServerSideEncryptionByDefault': {'SSEAlgorithm': 'aws:kms'}}]
             }
+        current = _current_rules(
+            lambda: s3_client.get_bucket_encryption(Bucket=bucket_name)['ServerSideEncryptionConfiguration']['Rules']
+        )
+        if _rules_match(current, encryption_config['Rules']):
+            print(f"Encryption already enabled for bucket '{bucket_name}'")
+            return True
         s3_client.put_bucket_encryption(
             Bucket=bucket_name,
             ServerSideEncryptionConfiguration=encryption_config
@@ -80,6 +127,10 @@ def configure_cors(bucket_name, allowed_origins=['*'], allowed_methods=['GET', '
                 }
             ]
         }
+        current = _current_rules(lambda: s3_client.get_bucket_cors(Bucket=bucket_name)['CORSRules'])
+        if _rules_match(current, cors_config['CORSRules']):
+            print(f"CORS already configured for bucket '{bucket_name}'")
+            return True
         s3_client.put_bucket_cors(Bucket=bucket_name, CORSConfiguration=cors_config)
         print(f"CORS configured for bucket '{bucket_name}'")
         return True
@@ -96,7 +147,7 @@ def enable_static_website_hosting(bucket_name, index_document='index.html', erro
                 'ErrorDocument': {'Key': error_document}
             }
         )
-        website_url = f"http://{bucket_name}.s3-website-{s3_client.meta.region_name}.amazonaws.com"
+        website_url = _WEBSITE_URL_FMT.format(bucket=bucket_name)
         print(f"Static website hosting enabled: {website_url}")
         return website_url
     except ClientError as e:
@@ -104,8 +155,12 @@ def enable_static_website_hosting(bucket_name, index_document='index.html', erro
         return None
 
 def set_bucket_policy(bucket_name, policy_json):
+    # policy_json may be a dict or an already-encoded JSON string; pass the string
+    # when applying one policy to many buckets to skip re-encoding it each time
+    if not isinstance(policy_json, str):
+        policy_json = dumps(policy_json)
     try:
-        s3_client.put_bucket_policy(Bucket=bucket_name, Policy=json.dumps(policy_json))
+        s3_client.put_bucket_policy(Bucket=bucket_name, Policy=policy_json)
         print(f"Bucket policy set for '{bucket_name}'")
         return True
     except ClientError as e:
@@ -169,6 +224,55 @@ def complete_multipart_upload(bucket_name, object_name, upload_id, parts):
         print(f"Error completing multipart upload: {e}")
         return False
 
+MIN_PART_SIZE = 5 * 1024 * 1024
+# S3 accepts at most this many parts per multipart upload
+MAX_PART_COUNT = 10000
+
+def upload_file_multipart(file_path, bucket_name, object_name, part_size=16 * 1024 * 1024, concurrency=8):
+    # Parts are sliced from a memory-mapped file inside the worker threads, so at most
+    # `concurrency` parts are in memory at once regardless of the file size
+    if part_size < MIN_PART_SIZE:
+        raise ValueError("part_size must be at least 5 MiB")
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # An empty file cannot be memory-mapped and has no parts to send
+            try:
+                s3_client.put_object(Bucket=bucket_name, Key=object_name, Body=b'')
+                print(f"Empty object '{object_name}' uploaded")
+                return True
+            except ClientError as e:
+                print(f"Error uploading empty object: {e}")
+                return False
+        # Parts grow as needed to keep large files within MAX_PART_COUNT
+        part_size = max(part_size, -(-size // MAX_PART_COUNT))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            upload_id = create_multipart_upload(bucket_name, object_name)
+            if upload_id is None:
+                return False
+
+            def send_part(part_number):
+                offset = (part_number - 1) * part_size
+                return upload_part(bucket_name, object_name, upload_id, part_number, mm[offset:offset + part_size])
+
+            part_count = (size + part_size - 1) // part_size
+            try:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    parts = list(executor.map(send_part, range(1, part_count + 1)))
+            except Exception as e:
+                # e.g. a BotoCoreError connection failure, which upload_part does not catch
+                print(f"Error uploading parts: {e}")
+                parts = [None]
+
+    if None in parts:
+        try:
+            s3_client.abort_multipart_upload(Bucket=bucket_name, Key=object_name, UploadId=upload_id)
+            print(f"Multipart upload aborted for '{object_name}'")
+        except ClientError as e:
+            print(f"Error aborting multipart upload: {e}")
+        return False
+    return complete_multipart_upload(bucket_name, object_name, upload_id, parts)
+
 def get_bucket_notification_config(bucket_name):
     try:
         response = s3_client.get_bucket_notification_configuration(Bucket=bucket_name)
@@ -225,6 +329,53 @@ def generate_presigned_post(bucket_name, object_name, expiration=3600, max_size=
         print(f"Error generating presigned POST: {e}")
         return None
 
+# SigV4 signing keys by (secret key, date, region); one key is valid for a whole UTC day
+_signing_keys = {}
+
+def _signing_key(secret_key, date_stamp):
+    cache_key = (secret_key, date_stamp, _REGION)
+    key = _signing_keys.get(cache_key)
+    if key is None:
+        key = ('AWS4' + secret_key).encode()
+        for part in (date_stamp, _REGION, 's3', 'aws4_request'):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        _signing_keys.clear()
+        _signing_keys[cache_key] = key
+    return key
+
+def generate_presigned_post_batch(bucket_name, object_names, expiration=3600, max_size=10485760):
+    # Same fields as generate_presigned_post for many keys at once: the signing key is
+    # derived once and reused, leaving one HMAC per presign instead of five
+    credentials = get_session().get_credentials()
+    if credentials is None:
+        print("Error generating presigned POSTs: no AWS credentials found")
+        return {}
+    credentials = credentials.get_frozen_credentials()
+    now = datetime.now(timezone.utc)
+    date_stamp = now.strftime('%Y%m%d')
+    signing_key = _signing_key(credentials.secret_key, date_stamp)
+    url = s3_client.meta.endpoint_url.replace('://', f'://{bucket_name}.', 1) + '/'
+    expires = (now + timedelta(seconds=expiration)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    signed_fields = {
+        'x-amz-algorithm': 'AWS4-HMAC-SHA256',
+        'x-amz-credential': f"{credentials.access_key}/{date_stamp}/{_REGION}/s3/aws4_request",
+        'x-amz-date': now.strftime('%Y%m%dT%H%M%SZ'),
+    }
+    if credentials.token:
+        signed_fields['x-amz-security-token'] = credentials.token
+
+    presigned = {}
+    for object_name in object_names:
+        fields = {'acl': 'private', 'key': object_name, **signed_fields}
+        conditions = [{'acl': 'private'}, ['content-length-range', 1, max_size], {'bucket': bucket_name}]
+        conditions += [{name: value} for name, value in fields.items() if name != 'acl']
+        policy = base64.b64encode(dumps({'expiration': expires, 'conditions': conditions}).encode()).decode()
+        fields['policy'] = policy
+        fields['x-amz-signature'] = hmac.new(signing_key, policy.encode(), hashlib.sha256).hexdigest()
+        presigned[object_name] = {'url': url, 'fields': fields}
+    print(f"Generated {len(presigned)} presigned POST URLs for '{bucket_name}'")
+    return presigned
+
 def list_object_versions(bucket_name, prefix=''):
     try:
         response = s3_client.list_object_versions(Bucket=bucket_name, Prefix=prefix)
@@ -243,6 +394,43 @@ def list_object_versions(bucket_name, prefix=''):
         print(f"Error listing versions: {e}")
         return []
 
+# Bucket settings that configure_bucket can apply, keyed by step name
+BUCKET_CONFIG_STEPS = {
+    'versioning': enable_versioning,
+    'lifecycle': enable_lifecycle_policy,
+    'encryption': enable_encryption,
+    'cors': configure_cors,
+    'website': enable_static_website_hosting,
+    'policy': set_bucket_policy,
+    'logging': enable_logging,
+    'notifications': configure_event_notifications,
+}
+
+def configure_bucket(bucket_name, max_workers=8, **steps):
+    # Each keyword selects a step and holds its extra arguments (True for defaults), e.g.
+    # configure_bucket('my-bucket', versioning=True, logging={'target_bucket': 'my-logs'})
+    # The calls are independent, so they run concurrently and take as long as the slowest one.
+    unknown = set(steps) - set(BUCKET_CONFIG_STEPS)
+    if unknown:
+        raise ValueError(f"Unknown bucket configuration steps: {sorted(unknown)}")
+    # False/None skip a step; {} runs it with defaults like True does
+    calls = {
+        name: (BUCKET_CONFIG_STEPS[name], kwargs if isinstance(kwargs, dict) else {})
+        for name, kwargs in steps.items() if kwargs is not None and kwargs is not False
+    }
+    # Missing or unexpected arguments are reported before any step runs
+    for name, (step, kwargs) in calls.items():
+        try:
+            inspect.signature(step).bind(bucket_name, **kwargs)
+        except TypeError as e:
+            raise TypeError(f"Invalid arguments for bucket configuration step '{name}': {e}") from None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            name: executor.submit(step, bucket_name, **kwargs)
+            for name, (step, kwargs) in calls.items()
+        }
+    return {name: future.result() for name, future in futures.items()}
+
 if __name__ == "__main__":
     print("=" * 60)
     print("AWS S3 Advanced Features - Template Code")
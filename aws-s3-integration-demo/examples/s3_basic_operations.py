@@ -1,138 +1,174 @@
 #!/usr/bin/env python3
-import boto3
 from botocore.exceptions import ClientError
 import json
+import logging
+from aws_common import client, get_transfer_config, resource
 
-s3_client = boto3.client('s3')
-s3_resource = boto3.resource('s3')
+logger = logging.getLogger(__name__)
 
 def create_bucket(bucket_name, region='us-east-1'):
     try:
         if region == 'us-east-1':
-            response = s3_client.create_bucket(Bucket=bucket_name)
+            response = client('s3').create_bucket(Bucket=bucket_name)
         else:
-            response = s3_client.create_bucket(
+            response = client('s3').create_bucket(
                 Bucket=bucket_name,
                 CreateBucketConfiguration={'LocationConstraint': region}
             )
-        print(f"Bucket '{bucket_name}' created successfully")
+        logger.info("Bucket '%s' created successfully", bucket_name)
         return response
     except ClientError as e:
-        print(f"Error creating bucket: {e}")
+        logger.error("Error creating bucket: %s", e)
         return None
 
 def upload_file(file_path, bucket_name, object_name=None):
     if object_name is None:
         object_name = file_path
     try:
-        s3_client.upload_file(file_path, bucket_name, object_name)
-        print(f"File '{file_path}' uploaded to '{bucket_name}/{object_name}'")
+        client('s3').upload_file(file_path, bucket_name, object_name, Config=get_transfer_config())
+        logger.info("File '%s' uploaded to '%s/%s'", file_path, bucket_name, object_name)
         return True
     except ClientError as e:
-        print(f"Error uploading file: {e}")
+        logger.error("Error uploading file: %s", e)
         return False
 
 def upload_fileobj(file_obj, bucket_name, object_name):
     try:
-        s3_client.upload_fileobj(file_obj, bucket_name, object_name)
-        print(f"File object uploaded to '{bucket_name}/{object_name}'")
+        client('s3').upload_fileobj(file_obj, bucket_name, object_name, Config=get_transfer_config())
+        logger.info("File object uploaded to '%s/%s'", bucket_name, object_name)
         return True
     except ClientError as e:
-        print(f"Error uploading file object: {e}")
+        logger.error("Error uploading file object: %s", e)
         return False
 
 def download_file(bucket_name, object_name, local_file_path):
     try:
-        s3_client.download_file(bucket_name, object_name, local_file_path)
-        print(f"File '{object_name}' downloaded to '{local_file_path}'")
+        client('s3').download_file(bucket_name, object_name, local_file_path, Config=get_transfer_config())
+        logger.info("File '%s' downloaded to '%s'", object_name, local_file_path)
         return True
     except ClientError as e:
-        print(f"Error downloading file: {e}")
+        logger.error("Error downloading file: %s", e)
         return False
 
 def download_fileobj(bucket_name, object_name, file_obj):
     try:
-        s3_resource.Bucket(bucket_name).Object(object_name).download_fileobj(file_obj)
-        print(f"File '{object_name}' downloaded to file object")
+        resource('s3').Bucket(bucket_name).Object(object_name).download_fileobj(file_obj, Config=get_transfer_config())
+        logger.info("File '%s' downloaded to file object", object_name)
         return True
     except ClientError as e:
-        print(f"Error downloading file object: {e}")
+        logger.error("Error downloading file object: %s", e)
         return False
 
 def list_buckets():
     try:
-        response = s3_client.list_buckets()
+        response = client('s3').list_buckets()
         buckets = [bucket['Name'] for bucket in response['Buckets']]
-        print(f"Available buckets: {buckets}")
+        logger.info("Available buckets: %s", buckets)
         return buckets
     except ClientError as e:
-        print(f"Error listing buckets: {e}")
+        logger.error("Error listing buckets: %s", e)
         return []
 
 def list_objects(bucket_name, prefix=''):
     try:
-        response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
+        response = client('s3').list_objects_v2(Bucket=bucket_name, Prefix=prefix)
         if 'Contents' in response:
             objects = [obj['Key'] for obj in response['Contents']]
-            print(f"Objects in '{bucket_name}': {objects}")
+            logger.info("Objects in '%s': %s", bucket_name, objects)
             return objects
         else:
-            print(f"No objects found in '{bucket_name}'")
+            logger.info("No objects found in '%s'", bucket_name)
             return []
     except ClientError as e:
-        print(f"Error listing objects: {e}")
+        logger.error("Error listing objects: %s", e)
         return []
 
 def get_object(bucket_name, object_name):
+    # Reads the whole object into memory; use stream_object for large objects
     try:
-        response = s3_client.get_object(Bucket=bucket_name, Key=object_name)
+        response = client('s3').get_object(Bucket=bucket_name, Key=object_name)
         content = response['Body'].read()
-        print(f"Retrieved object '{object_name}' from '{bucket_name}'")
+        logger.info("Retrieved object '%s' from '%s'", object_name, bucket_name)
         return content
     except ClientError as e:
-        print(f"Error getting object: {e}")
+        logger.error("Error getting object: %s", e)
         return None
 
+def stream_object(bucket_name, object_name, chunk_size=1024 * 1024):
+    # Returns an iterator over the object body in chunk_size pieces so memory
+    # stays O(chunk), or None if the object cannot be read, e.g.
+    # chunks = stream_object('my-bucket', 'big.log')
+    # for chunk in chunks or (): out.write(chunk)
+    try:
+        response = client('s3').get_object(Bucket=bucket_name, Key=object_name)
+    except ClientError as e:
+        logger.error("Error getting object: %s", e)
+        return None
+    return _iter_body(response['Body'], chunk_size)
+
+def _iter_body(body, chunk_size):
+    with body:
+        yield from body.iter_chunks(chunk_size)
+
 def delete_object(bucket_name, object_name):
     try:
-        s3_client.delete_object(Bucket=bucket_name, Key=object_name)
-        print(f"Object '{object_name}' deleted from '{bucket_name}'")
+        client('s3').delete_object(Bucket=bucket_name, Key=object_name)
+        logger.info("Object '%s' deleted from '%s'", object_name, bucket_name)
         return True
     except ClientError as e:
-        print(f"Error deleting object: {e}")
+        logger.error("Error deleting object: %s", e)
         return False
 
 def delete_bucket(bucket_name):
     try:
-        s3_client.delete_bucket(Bucket=bucket_name)
-        print(f"Bucket '{bucket_name}' deleted")
+        client('s3').delete_bucket(Bucket=bucket_name)
+        logger.info("Bucket '%s' deleted", bucket_name)
         return True
     except ClientError as e:
-        print(f"Error deleting bucket: {e}")
+        logger.error("Error deleting bucket: %s", e)
         return False
 
 def put_object(bucket_name, object_name, content):
     try:
-        s3_client.put_object(Bucket=bucket_name, Key=object_name, Body=content)
-        print(f"Object '{object_name}' created in '{bucket_name}'")
+        client('s3').put_object(Bucket=bucket_name, Key=object_name, Body=content)
+        logger.info("Object '%s' created in '%s'", object_name, bucket_name)
         return True
     except ClientError as e:
-        print(f"Error putting object: {e}")
+        logger.error("Error putting object: %s", e)
         return False
 
+# Single CopyObject request; S3 rejects it for sources over 5 GB
+SINGLE_COPY_LIMIT = 5 * 1024 ** 3
+
 def copy_object(source_bucket, source_key, dest_bucket, dest_key):
+    # One round trip; use copy_large_object for sources over SINGLE_COPY_LIMIT
+    try:
+        client('s3').copy_object(
+            Bucket=dest_bucket,
+            Key=dest_key,
+            CopySource={'Bucket': source_bucket, 'Key': source_key}
+        )
+        logger.info("Object copied from '%s/%s' to '%s/%s'", source_bucket, source_key, dest_bucket, dest_key)
+        return True
+    except ClientError as e:
+        logger.error("Error copying object: %s", e)
+        return False
+
+def copy_large_object(source_bucket, source_key, dest_bucket, dest_key):
+    # Managed copy: a HeadObject to size the source, then a multipart copy
+    # when it is above the transfer threshold
     try:
         copy_source = {'Bucket': source_bucket, 'Key': source_key}
-        s3_resource.meta.client.copy(copy_source, dest_bucket, dest_key)
-        print(f"Object copied from '{source_bucket}/{source_key}' to '{dest_bucket}/{dest_key}'")
+        client('s3').copy(copy_source, dest_bucket, dest_key, Config=get_transfer_config())
+        logger.info("Object copied from '%s/%s' to '%s/%s'", source_bucket, source_key, dest_bucket, dest_key)
         return True
     except ClientError as e:
-        print(f"Error copying object: {e}")
+        logger.error("Error copying object: %s", e)
         return False
 
 def get_object_metadata(bucket_name, object_name):
     try:
-        response = s3_client.head_object(Bucket=bucket_name, Key=object_name)
+        response = client('s3').head_object(Bucket=bucket_name, Key=object_name)
         metadata = {
             'ContentType': response.get('ContentType'),
             'ContentLength': response.get('ContentLength'),
@@ -140,35 +176,37 @@ def get_object_metadata(bucket_name, object_name):
             'ETag': response.get('ETag'),
             'Metadata': response.get('Metadata', {})
         }
-        print(f"Metadata for '{object_name}': {json.dumps(metadata, indent=2, default=str)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Metadata for '%s': %s", object_name, json.dumps(metadata, indent=2, default=str))
         return metadata
     except ClientError as e:
-        print(f"Error getting metadata: {e}")
+        logger.error("Error getting metadata: %s", e)
         return None
 
 def set_object_acl(bucket_name, object_name, acl='private'):
     try:
-        s3_client.put_object_acl(Bucket=bucket_name, Key=object_name, ACL=acl)
-        print(f"ACL set to '{acl}' for '{object_name}'")
+        client('s3').put_object_acl(Bucket=bucket_name, Key=object_name, ACL=acl)
+        logger.info("ACL set to '%s' for '%s'", acl, object_name)
         return True
     except ClientError as e:
-        print(f"Error setting ACL: {e}")
+        logger.error("Error setting ACL: %s", e)
         return False
 
 def generate_presigned_url(bucket_name, object_name, expiration=3600):
     try:
-        url = s3_client.generate_presigned_url(
+        url = client('s3').generate_presigned_url(
             'get_object',
             Params={'Bucket': bucket_name, 'Key': object_name},
             ExpiresIn=expiration
         )
-        print(f"Presigned URL generated for '{object_name}' (expires in {expiration}s)")
+        logger.info("Presigned URL generated for '%s' (expires in %ss)", object_name, expiration)
         return url
     except ClientError as e:
-        print(f"Error generating presigned URL: {e}")
+        logger.error("Error generating presigned URL: %s", e)
         return None
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     print("=" * 60)
     print("AWS S3 Basic Operations - Template Code")
     print("=" * 60)
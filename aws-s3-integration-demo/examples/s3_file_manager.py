@@ -1,125 +1,255 @@
 #!/usr/bin/env python3
-import boto3
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from botocore.exceptions import ClientError
+from aws_common import client, get_transfer_config, resource
 
-s3_client = boto3.client('s3')
-s3_resource = boto3.resource('s3')
+logger = logging.getLogger(__name__)
+
+# Files transferred at once; each file's part concurrency is scaled down so
+# the parts in flight across all workers fit in the shared connection pool
+TRANSFER_WORKERS = 16
+
+# DeleteObjects limit per request
+DELETE_BATCH_SIZE = 1000
+
+# Initial row capacity of the arrays built by list_files_soa
+SOA_CHUNK_ROWS = 65536
+
+def _key_base(s3_prefix):
+    # Normalized once per call; keys are then built as base + relative POSIX path
+    prefix = s3_prefix.strip('/')
+    return prefix + '/' if prefix else ''
+
+def _walk(root):
+    # Yields (relative POSIX path, path, mtime, size) for every file under root.
+    # DirEntry carries the file type from the directory listing, so only one
+    # stat per file is needed. Like rglob, symlinked files are followed but
+    # symlinked directories are not descended into. Unreadable directories
+    # are logged and skipped, as rglob skipped them
+    stack = [(os.fspath(root), '')]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except PermissionError as e:
+            logger.warning("Skipping unreadable directory %s: %s", directory, e)
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, prefix + entry.name + '/'))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    yield prefix + entry.name, entry.path, stat.st_mtime, stat.st_size
 
 class S3FileManager:
     def __init__(self, bucket_name):
         self.bucket_name = bucket_name
-        self.bucket = s3_resource.Bucket(bucket_name)
+        self.bucket = resource('s3').Bucket(bucket_name)
+        # Resource objects are not thread-safe; pooled transfers use the client
+        self._client = client('s3')
+    
+    def _run_transfers(self, transfer, tasks, max_workers):
+        # Calls transfer(*task) for every task on a thread pool and returns
+        # (task, error) pairs in order, error being None on success
+        from boto3.exceptions import S3UploadFailedError
+        
+        config = get_transfer_config(workers=max_workers)
+        
+        def run(task):
+            try:
+                transfer(*task, Config=config)
+                return task, None
+            except (ClientError, S3UploadFailedError) as e:
+                return task, e
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, tasks))
+    
+    def _iter_objects(self, prefix):
+        # Reads ListObjectsV2 pages as plain dicts instead of wrapping every
+        # object in a resource instance
+        paginator = self._client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix,
+                                       PaginationConfig={'PageSize': 1000}):
+            yield from page.get('Contents', ())
     
-    def upload_directory(self, local_dir, s3_prefix=''):
+    def upload_directory(self, local_dir, s3_prefix='', max_workers=TRANSFER_WORKERS):
         uploaded_files = []
-        local_path = Path(local_dir)
+        key_base = _key_base(s3_prefix)
+        
+        tasks = []
+        for relative, file_path, _, _ in _walk(local_dir):
+            tasks.append((file_path, self.bucket_name, key_base + relative))
         
-        for file_path in local_path.rglob('*'):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(local_path)
-                s3_key = f"{s3_prefix}/{relative_path}".replace('\\', '/').lstrip('/')
-                
-                try:
-                    self.bucket.upload_file(str(file_path), s3_key)
-                    uploaded_files.append(s3_key)
-                    print(f"Uploaded: {file_path} -> s3://{self.bucket_name}/{s3_key}")
-                except ClientError as e:
-                    print(f"Error uploading {file_path}: {e}")
+        failures = []
+        for (file_path, _, s3_key), error in self._run_transfers(self._client.upload_file, tasks, max_workers):
+            if error is None:
+                uploaded_files.append(s3_key)
+                logger.info("Uploaded: %s -> s3://%s/%s", file_path, self.bucket_name, s3_key)
+            else:
+                failures.append((file_path, error))
+        for file_path, error in failures:
+            logger.error("Error uploading %s: %s", file_path, error)
         
         return uploaded_files
     
-    def download_directory(self, s3_prefix, local_dir):
+    def download_directory(self, s3_prefix, local_dir, max_workers=TRANSFER_WORKERS):
         downloaded_files = []
         local_path = Path(local_dir)
         local_path.mkdir(parents=True, exist_ok=True)
         
         try:
-            objects = self.bucket.objects.filter(Prefix=s3_prefix)
-            for obj in objects:
-                s3_key = obj.key
+            tasks = []
+            for obj in self._iter_objects(s3_prefix):
+                s3_key = obj['Key']
                 relative_path = s3_key.replace(s3_prefix, '').lstrip('/')
                 local_file_path = local_path / relative_path
                 local_file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                try:
-                    self.bucket.download_file(s3_key, str(local_file_path))
-                    downloaded_files.append(str(local_file_path))
-                    print(f"Downloaded: s3://{self.bucket_name}/{s3_key} -> {local_file_path}")
-                except ClientError as e:
-                    print(f"Error downloading {s3_key}: {e}")
+                tasks.append((self.bucket_name, s3_key, str(local_file_path)))
         except ClientError as e:
-            print(f"Error listing objects: {e}")
+            logger.error("Error listing objects: %s", e)
+            return downloaded_files
+        
+        failures = []
+        for (_, s3_key, local_file_path), error in self._run_transfers(self._client.download_file, tasks, max_workers):
+            if error is None:
+                downloaded_files.append(local_file_path)
+                logger.info("Downloaded: s3://%s/%s -> %s", self.bucket_name, s3_key, local_file_path)
+            else:
+                failures.append((s3_key, error))
+        for s3_key, error in failures:
+            logger.error("Error downloading %s: %s", s3_key, error)
         
         return downloaded_files
     
     def sync_directory(self, local_dir, s3_prefix='', delete=False):
-        local_path = Path(local_dir)
-        local_files = {str(f.relative_to(local_path)): f.stat().st_mtime 
-                      for f in local_path.rglob('*') if f.is_file()}
+        key_base = _key_base(s3_prefix)
+        local_files = {}
+        for relative, path, mtime, size in _walk(local_dir):
+            local_files[relative] = (size, mtime, path)
         
         try:
-            s3_objects = {obj.key.replace(s3_prefix, '').lstrip('/'): obj.last_modified.timestamp()
-                          for obj in self.bucket.objects.filter(Prefix=s3_prefix)}
+            # Size and mtime both come with the listing, so no per-object requests
+            s3_objects = {}
+            for obj in self._iter_objects(s3_prefix):
+                s3_objects[obj['Key'].replace(s3_prefix, '').lstrip('/')] = (
+                    obj['Size'], obj['LastModified'].timestamp()
+                )
             
-            for local_file, local_mtime in local_files.items():
-                s3_key = f"{s3_prefix}/{local_file}".replace('\\', '/').lstrip('/')
-                if local_file not in s3_objects or local_mtime > s3_objects[local_file]:
+            for local_file, (local_size, local_mtime, file_path) in local_files.items():
+                s3_key = key_base + local_file
+                remote = s3_objects.get(local_file)
+                if remote is None or local_size != remote[0] or local_mtime > remote[1]:
                     try:
-                        self.bucket.upload_file(str(local_path / local_file), s3_key)
-                        print(f"Synced: {local_file} -> s3://{self.bucket_name}/{s3_key}")
+                        self.bucket.upload_file(file_path, s3_key, Config=get_transfer_config())
+                        logger.info("Synced: %s -> s3://%s/%s", local_file, self.bucket_name, s3_key)
                     except ClientError as e:
-                        print(f"Error syncing {local_file}: {e}")
+                        logger.error("Error syncing %s: %s", local_file, e)
             
             if delete:
                 for s3_file in s3_objects:
                     if s3_file not in local_files:
-                        s3_key = f"{s3_prefix}/{s3_file}".replace('\\', '/').lstrip('/')
+                        s3_key = key_base + s3_file
                         try:
                             self.bucket.Object(s3_key).delete()
-                            print(f"Deleted: s3://{self.bucket_name}/{s3_key}")
+                            logger.info("Deleted: s3://%s/%s", self.bucket_name, s3_key)
                         except ClientError as e:
-                            print(f"Error deleting {s3_key}: {e}")
+                            logger.error("Error deleting %s: %s", s3_key, e)
         except ClientError as e:
-            print(f"Error syncing: {e}")
+            logger.error("Error syncing: %s", e)
     
     def get_file_size(self, s3_key):
         try:
             obj = self.bucket.Object(s3_key)
             return obj.content_length
         except ClientError as e:
-            print(f"Error getting file size: {e}")
+            logger.error("Error getting file size: %s", e)
             return None
     
+    def iter_files(self, prefix=''):
+        # (key, size, last_modified) tuples straight from the listing pages
+        for obj in self._iter_objects(prefix):
+            yield obj['Key'], obj['Size'], obj['LastModified']
+    
     def list_files_recursive(self, prefix=''):
-        files = []
+        # Generator: files are yielded page by page so callers can stream large prefixes
         try:
-            for obj in self.bucket.objects.filter(Prefix=prefix):
-                files.append({
-                    'key': obj.key,
-                    'size': obj.size,
-                    'last_modified': obj.last_modified
-                })
+            for key, size, last_modified in self.iter_files(prefix):
+                yield {
+                    'key': key,
+                    'size': size,
+                    'last_modified': last_modified
+                }
         except ClientError as e:
-            print(f"Error listing files: {e}")
-        return files
+            logger.error("Error listing files: %s", e)
     
-    def delete_files_by_prefix(self, prefix):
+    def list_files_soa(self, prefix=''):
+        # Column layout for very large listings: a list of keys plus int64 NumPy arrays
+        # of sizes and mtimes (epoch seconds), e.g. sizes.sum() for the prefix total.
+        # The arrays start at SOA_CHUNK_ROWS rows, double when full and are trimmed at the end.
+        import numpy as np
+        keys = []
+        sizes = np.empty(SOA_CHUNK_ROWS, dtype=np.int64)
+        mtimes = np.empty(SOA_CHUNK_ROWS, dtype=np.int64)
+        try:
+            for key, size, last_modified in self.iter_files(prefix):
+                row = len(keys)
+                if row == len(sizes):
+                    sizes = np.concatenate((sizes, np.empty_like(sizes)))
+                    mtimes = np.concatenate((mtimes, np.empty_like(mtimes)))
+                keys.append(key)
+                sizes[row] = size
+                mtimes[row] = int(last_modified.timestamp())
+        except ClientError as e:
+            logger.error("Error listing files: %s", e)
+        # Copies, so the spare capacity of the doubled buffers is freed
+        return keys, sizes[:len(keys)].copy(), mtimes[:len(keys)].copy()
+    
+    def _delete_batch(self, objects):
+        # Quiet mode only reports failures, so the count is derived from them
+        response = self._client.delete_objects(
+            Bucket=self.bucket_name,
+            Delete={'Objects': objects, 'Quiet': True}
+        )
+        errors = response.get('Errors', [])
+        for error in errors:
+            logger.error("Error deleting %s: %s", error['Key'], error.get('Message'))
+        return len(objects) - len(errors)
+    
+    def delete_files_by_prefix(self, prefix, max_workers=8):
+        # DeleteObjects accepts at most 1000 keys, so a request is sent for every
+        # full batch while listing continues
         deleted_count = 0
+        futures = []
         try:
-            objects = [{'Key': obj.key} for obj in self.bucket.objects.filter(Prefix=prefix)]
-            if objects:
-                response = self.bucket.delete_objects(
-                    Delete={'Objects': objects}
-                )
-                deleted_count = len(response.get('Deleted', []))
-                print(f"Deleted {deleted_count} files with prefix '{prefix}'")
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                batch = []
+                for obj in self._iter_objects(prefix):
+                    batch.append({'Key': obj['Key']})
+                    if len(batch) == DELETE_BATCH_SIZE:
+                        futures.append(executor.submit(self._delete_batch, batch))
+                        batch = []
+                if batch:
+                    futures.append(executor.submit(self._delete_batch, batch))
         except ClientError as e:
-            print(f"Error deleting files: {e}")
+            logger.error("Error listing files to delete: %s", e)
+        # Leaving the executor waits for every submitted batch, so batches sent
+        # before a listing error are still counted
+        for future in futures:
+            try:
+                deleted_count += future.result()
+            except ClientError as e:
+                logger.error("Error deleting files: %s", e)
+        if futures:
+            logger.info("Deleted %s files with prefix '%s'", deleted_count, prefix)
         return deleted_count
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     print("=" * 60)
     print("AWS S3 File Manager - Template Code")
     print("=" * 60)